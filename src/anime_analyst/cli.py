@@ -1,17 +1,10 @@
 from __future__ import annotations
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
-import requests
+from typing import Any, Callable, Dict, List
 
-from anime_analyst.clients import jikan as jikan
-from anime_analyst.clients import anilist as anilist
-from anime_analyst.data.io import save_csv, load_csv
 from anime_analyst.data.genres import GenreResolver
-from anime_analyst.core.filter import filter_rows
-from anime_analyst.core.merge import merge_mal_anilist
-from anime_analyst.core.scoring import compute_bayesian_scores, compute_consensus_bayesian
-from anime_analyst.core.plotting import plot_hbar_top
 
 PARAM_SPEC: Dict[str, Dict[str, Any]] = {
     "q": {"type": str, "default": "", "help": "title keyword"},
@@ -27,15 +20,19 @@ PARAM_SPEC: Dict[str, Dict[str, Any]] = {
     "max_pages": {"type": int, "default": 5},
     "sfw": {"type": bool, "default": False},
     "no_fetch": {"type": bool, "default": False},
-    "csv": {"type": str, "default": "data/anime_cache.csv"},
+    "csv": {"type": str, "default": "data/anime_cache.parquet", "help": "cache path (.parquet, or legacy .csv)"},
     "prior_m": {"type": float, "default": None},
     "topk": {"type": int, "default": 20},
+    "save_plot": {"type": str, "default": "", "help": "save chart to this PNG path instead of showing it"},
     "use_anilist": {"type": bool, "default": False},
     "al_pop_alpha": {"type": float, "default": 0.30},
 }
 
 GENRES = GenreResolver()
 
+# Columns the filter/score/plot path reads back from the cache
+CACHE_COLUMNS = ["type","status","year","score","scored_by","genres","members","popularity","title","mal_id"]
+
 def _print_param_help() -> None:
     print("\nType `key value` or `key=value`. Repeat to overwrite. Type `start` to run.")
     for k, spec in PARAM_SPEC.items():
@@ -52,23 +49,31 @@ def _coerce_bool(val: str | None, cur: bool) -> bool:
     if v in ("0","false","f","no","n","off"): return False
     raise ValueError("true/false/1/0/yes/no/on/off or empty to toggle")
 
+def _coerce_required(cast: Callable[[str], Any], what: str) -> Callable[[str | None, Any], Any]:
+    def coerce(val: str | None, cur: Any) -> Any:
+        if val is None: raise ValueError(f"{what} required")
+        return cast(val)
+    return coerce
+
+_COERCERS: Dict[Any, Callable[[str | None, Any], Any]] = {
+    bool: lambda val, cur: _coerce_bool(val, bool(cur)),
+    int: _coerce_required(int, "integer"),
+    float: _coerce_required(float, "float"),
+    str: lambda val, cur: "" if val is None else val,
+    "list": lambda val, cur: None if not val else [x.strip() for x in val.replace(",", " ").split() if x.strip()],
+}
+
+for _spec in PARAM_SPEC.values():
+    if _spec.get("choices"): _spec["_choices_fs"] = frozenset(_spec["choices"])
+
 def _coerce_value(key: str, val: str | None, state: Dict[str, Any]) -> Any:
-    spec = PARAM_SPEC[key]; typ = spec["type"]
-    if "choices" in spec and spec["choices"] and val is not None and val not in spec["choices"]:
+    spec = PARAM_SPEC[key]
+    choices = spec.get("_choices_fs")
+    if choices and val is not None and val not in choices:
         raise ValueError(f"{key} choices: {spec['choices']}")
-    if typ is bool: return _coerce_bool(val, bool(state.get(key, spec["default"])))
-    if typ is int:
-        if val is None: raise ValueError("integer required"); return int(val)
-        return int(val)
-    if typ is float:
-        if val is None: raise ValueError("float required"); return float(val)
-        return float(val)
-    if typ == "list":
-        if not val: return None
-        return [x.strip() for x in val.replace(",", " ").split() if x.strip()]
-    if typ is str:
-        return "" if val is None else val
-    raise ValueError(f"unknown type: {typ}")
+    coerce = _COERCERS.get(spec["type"])
+    if coerce is None: raise ValueError(f"unknown type: {spec['type']}")
+    return coerce(val, state.get(key, spec["default"]))
 
 def interactive_collect() -> argparse.Namespace:
     state: Dict[str, Any] = {k: spec["default"] for k, spec in PARAM_SPEC.items()}
@@ -110,36 +115,74 @@ def interactive_collect() -> argparse.Namespace:
             print(f"[!] Set failed: {e}")
     return argparse.Namespace(**state)
 
+def _pushdown_genres(args: argparse.Namespace) -> List[str]:
+    # Jikan `genres` and AniList `genre_in` both require every listed genre,
+    # so only all_genres (or a single any_genres entry) can go to the server
+    names = list(args.all_genres or [])
+    if args.any_genres and len(args.any_genres) == 1: names += args.any_genres
+    return names
+
 def run_pipeline(args: argparse.Namespace) -> None:
+    # imported here so the REPL prompt doesn't wait on requests/pyarrow/numpy
+    from anime_analyst.clients import jikan as jikan
+    from anime_analyst.clients import anilist as anilist
+    from anime_analyst.data.io import save_rows
+    from anime_analyst.core.filter import filter_rows, filter_rows_polars
+    from anime_analyst.core.merge import merge_mal_anilist
+    from anime_analyst.core.scoring import compute_bayesian_scores, compute_consensus_bayesian
+    from anime_analyst.core.plotting import plot_hbar_top
+
     csv_path = Path(args.csv)
     rows_ani: List[Dict[str, Any]] = []
+    any_genres, all_genres = args.any_genres, args.all_genres
 
     if not args.no_fetch:
-        print("Fetching from Jikan ...")
-        mal_raw = jikan.iterate(q=args.q, type_=args.type, status=args.status,
-                                start_year=args.year_from, end_year=args.year_to,
-                                min_score=args.min_score, limit_per_page=args.limit_per_page,
-                                max_pages=args.max_pages, sfw=args.sfw)
-        rows_mal = [jikan.flatten(a) for a in mal_raw]
-        save_csv(rows_mal, csv_path)
-
-        if args.use_anilist:
-            print("Fetching from AniList ...")
-            ani_raw = anilist.iterate(q=args.q, type_=args.type, status=args.status,
-                                      start_year=args.year_from, end_year=args.year_to,
-                                      per_page=50, max_pages=args.max_pages)
-            rows_ani = [anilist.flatten(a) for a in ani_raw]
+        genre_names, genre_ids = _pushdown_genres(args), []
+        if genre_names:
+            try: genre_ids = GENRES.ids_from_tokens(genre_names)
+            except Exception as e: print(f"[!] Genre lookup failed, filtering genres locally: {e}")
+        pushed = bool(genre_names) and len(genre_ids) == len(genre_names)
+        # AniList runs on a worker thread while Jikan pages on this one, so the two
+        # clients' rate-limit waits overlap instead of adding up
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            ani_future = None
+            if args.use_anilist:
+                print("Fetching from AniList ...")
+                ani_future = pool.submit(anilist.iterate, q=args.q, type_=args.type, status=args.status,
+                                         start_year=args.year_from, end_year=args.year_to,
+                                         per_page=50, max_pages=args.max_pages,
+                                         genres=genre_names or None)
+            print("Fetching from Jikan ...")
+            mal_raw = jikan.iterate(q=args.q, type_=args.type, status=args.status,
+                                    start_year=args.year_from, end_year=args.year_to,
+                                    min_score=args.min_score, limit_per_page=args.limit_per_page,
+                                    max_pages=args.max_pages, sfw=args.sfw,
+                                    genre_ids=genre_ids if pushed else None)
+            # cache the Jikan rows before waiting on AniList, so an AniList failure can't lose them
+            rows_mal = [r for r in map(jikan.flatten, mal_raw) if r]
+            save_rows(rows_mal, csv_path, fields=jikan.FIELDS)
+            if ani_future is not None:
+                rows_ani = [anilist.flatten(a) for a in ani_future.result()]
+        if pushed:  # Jikan already enforced these genres
+            all_genres = None
+            if any_genres and len(any_genres) == 1: any_genres = None
     else:
-        print("Skip fetching. Load CSV only.")
-
-    rows_mal = load_csv(csv_path)
-    if not rows_mal:
-        print("No rows. Exit."); return
-
-    rows_f = filter_rows(rows_mal, type_=args.type or None, status=args.status or None,
-                         year_from=args.year_from, year_to=args.year_to,
-                         min_score=args.min_score, min_scored_by=args.min_scored_by,
-                         include_any_genres=args.any_genres, include_all_genres=args.all_genres)
+        print("Skip fetching. Load cache only.")
+
+    filters = dict(type_=args.type or None, status=args.status or None,
+                   year_from=args.year_from, year_to=args.year_to,
+                   min_score=args.min_score, min_scored_by=args.min_scored_by,
+                   include_any_genres=any_genres, include_all_genres=all_genres)
+    if args.no_fetch:
+        if not csv_path.exists():
+            print("No rows. Exit."); return
+        # scan + filter the cache in one lazy pass (Polars if installed)
+        rows_f = filter_rows_polars(csv_path, columns=CACHE_COLUMNS, **filters)
+    else:
+        # just fetched: filter the typed in-memory rows rather than re-reading what we saved
+        if not rows_mal:
+            print("No rows. Exit."); return
+        rows_f = filter_rows(rows_mal, **filters)
     print(f"Filtered: {len(rows_f)} rows")
 
     if args.use_anilist:
@@ -163,7 +206,7 @@ def run_pipeline(args: argparse.Namespace) -> None:
     if args.any_genres: bits.append("genres_any=" + "|".join(args.any_genres))
     title = title_prefix + (" - " + ", ".join(bits) if bits else "")
 
-    plot_hbar_top(scored, topk=args.topk, title=title)
+    plot_hbar_top(scored, topk=args.topk, title=title, save_path=Path(args.save_plot) if args.save_plot else None)
 
 def main():
     args = interactive_collect()
@@ -1,51 +1,84 @@
 from __future__ import annotations
+import json
 import time
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
-import requests
+
+from anime_analyst.clients.session import get_session
+from anime_analyst.data.codec import json_dumps, json_loads
 
 ANILIST_GQL = "https://graphql.anilist.co"
 FORMAT = {"tv":"TV","movie":"MOVIE","ova":"OVA","ona":"ONA","special":"SPECIAL","music":"MUSIC"}
 STATUS = {"airing":"RELEASING","complete":"FINISHED","upcoming":"NOT_YET_RELEASED"}
 STATUS_BACK = {"RELEASING":"airing","FINISHED":"complete","NOT_YET_RELEASED":"upcoming"}
+# AniList's fixed genre vocabulary (MAL themes such as "School" are tags there, not genres)
+GENRES = {g.lower(): g for g in ("Action","Adventure","Comedy","Drama","Ecchi","Fantasy","Hentai","Horror",
+                                 "Mahou Shoujo","Mecha","Music","Mystery","Psychological","Romance",
+                                 "Sci-Fi","Slice of Life","Sports","Supernatural","Thriller")}
 
 def _to_yyyymmdd(y: int, end: bool = False) -> int: return int(f"{y}{'1231' if end else '0101'}")
 
-_QUERY = """
-query ($page:Int,$perPage:Int,$search:String,$format:MediaFormat,$status:MediaStatus,$start:Int,$end:Int){
-  Page(page:$page, perPage:$perPage){
+_VAR_DEFS = ("$perPage:Int,$search:String,$format:MediaFormat,$status:MediaStatus,$start:Int,$end:Int,"
+             "$genreIn:[String]")
+_PAGE_FIELDS = """
     pageInfo{currentPage hasNextPage}
-    media(type:ANIME, search:$search, format:$format, status:$status, startDate_greater:$start, startDate_lesser:$end){
+    media(type:ANIME, search:$search, format:$format, status:$status, startDate_greater:$start, startDate_lesser:$end,
+          genre_in:$genreIn){
       id idMal title{romaji english native} format status episodes duration
       averageScore popularity favourites seasonYear startDate{year} siteUrl
     }
-  }
-}
 """
+BATCH_PAGES = 5  # aliased Page blocks per request, kept well under AniList's complexity limit
+_HEADERS = {"Content-Type": "application/json", "Accept": "application/json"}
+
+@lru_cache(maxsize=None)
+def _body_prefix(n: int) -> bytes:
+    # `p0: Page(page:$p0 ...) p1: Page(page:$p1 ...)`; the document depends only on n, so it is
+    # minified and JSON-encoded once per batch size and per-request variables are spliced in
+    page_vars = "".join(f",$p{i}:Int" for i in range(n))
+    pages = " ".join(f"p{i}: Page(page:$p{i}, perPage:$perPage){{{_PAGE_FIELDS}}}" for i in range(n))
+    query = " ".join(f"query ({_VAR_DEFS}{page_vars}){{{pages}}}".split())
+    return b'{"query":' + json.dumps(query).encode() + b',"variables":'
+
+def _post_pages(sess: Any, base_vars: Dict[str, Any], pages: List[int]) -> List[Dict[str, Any]]:
+    vars = dict(base_vars, **{f"p{i}": p for i, p in enumerate(pages)})
+    body = _body_prefix(len(pages)) + json_dumps(vars) + b"}"
+    while True:
+        resp = sess.post(ANILIST_GQL, data=body, headers=_HEADERS, timeout=20)
+        if resp.status_code == 429:
+            retry = int(resp.headers.get("Retry-After", "2")); time.sleep(max(1, retry)); continue
+        resp.raise_for_status()
+        if int(resp.headers.get("X-RateLimit-Remaining", "90")) < 5:
+            time.sleep(60.0 / max(1, int(resp.headers.get("X-RateLimit-Limit", "90"))))
+        data = json_loads(resp.content)["data"]
+        return [data[f"p{i}"] for i in range(len(pages))]
 
 def iterate(q: str="", type_: str="", status: str="", start_year: Optional[int]=None,
-            end_year: Optional[int]=None, per_page: int=50, max_pages: Optional[int]=None
+            end_year: Optional[int]=None, per_page: int=50, max_pages: Optional[int]=None,
+            genres: Optional[List[str]]=None
             ) -> List[Dict[str, Any]]:
-    page, out, sess = 1, [], requests.Session()
+    genre_in = [GENRES[g.lower()] for g in genres or [] if g.lower() in GENRES]
     vars: Dict[str, Any] = {
-        "page": page, "perPage": per_page,
+        "perPage": per_page,
         "search": q or None,
         "format": FORMAT.get(type_.lower()) if type_ else None,
         "status": STATUS.get(status.lower()) if status else None,
         "start": _to_yyyymmdd(start_year, False) if start_year else None,
         "end": _to_yyyymmdd(end_year, True) if end_year else None,
+        "genreIn": genre_in or None,
     }
-    while True:
-        vars["page"] = page
-        resp = sess.post(ANILIST_GQL, json={"query": _QUERY, "variables": vars}, timeout=20)
-        if resp.status_code == 429:
-            retry = int(resp.headers.get("Retry-After", "2")); time.sleep(max(1, retry)); continue
-        resp.raise_for_status()
-        data = resp.json()["data"]["Page"]
-        out.extend(data.get("media") or [])
-        info = data["pageInfo"]
-        if (max_pages is not None and page >= max_pages) or not info.get("hasNextPage"):
-            break
-        page = info.get("currentPage", page) + 1
+    # page 1 alone, then pages 2.. in aliased batches of BATCH_PAGES per POST
+    sess = get_session()
+    first = _post_pages(sess, vars, [1])[0]
+    out: List[Dict[str, Any]] = list(first.get("media") or [])
+    has_next, page = bool(first["pageInfo"].get("hasNextPage")), 2
+    while has_next and (max_pages is None or page <= max_pages):
+        last = page + BATCH_PAGES - 1 if max_pages is None else min(page + BATCH_PAGES - 1, max_pages)
+        for data in _post_pages(sess, vars, list(range(page, last + 1))):
+            out.extend(data.get("media") or [])
+            has_next = bool(data["pageInfo"].get("hasNextPage"))
+            if not has_next: break
+        page = last + 1
         time.sleep(0.25)
     return out
 
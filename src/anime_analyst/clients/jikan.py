@@ -1,50 +1,163 @@
 from __future__ import annotations
+import re
+import threading
 import time
-from typing import Any, Dict, List, Optional
-import requests
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, TypedDict
+
+from anime_analyst.clients.session import build_http2_client, get_session
+from anime_analyst.data.cache import DiskCache
+from anime_analyst.data.codec import json_loads
+from anime_analyst.data.genres import GENRE_SEP
 
 JIKAN_BASE = "https://api.jikan.moe/v4/anime"
+STATUS_BACK = {"Currently Airing":"airing","Finished Airing":"complete","Not yet aired":"upcoming"}
+GENRE_KEYS = ("genres", "explicit_genres", "themes", "demographics")  # all four share /genres/anime ids
+MAX_WORKERS = 3  # Jikan allows ~3 requests/second
+_YEAR_RE = re.compile(r"(\d{4})")  # leading year of an ISO `aired.from` date
+
+# Sliding window: at most `rate` requests per `per` seconds, shared across threads.
+# A 429 pauses every worker, not just the one that hit it.
+class _RateLimiter:
+    def __init__(self, rate: int, per: float) -> None:
+        self._rate, self._per = rate, per
+        self._stamps: Deque[float] = deque()
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    def wait(self) -> None:
+        # sleep outside the lock so pause() lands immediately, and re-check both the pause
+        # and the window after every sleep: a 429 mid-sleep must hold back queued threads too
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._stamps and now - self._stamps[0] >= self._per: self._stamps.popleft()
+                delay = self._resume_at - now
+                if len(self._stamps) >= self._rate: delay = max(delay, self._per - (now - self._stamps[0]))
+                if delay <= 0:
+                    self._stamps.append(now); return
+            time.sleep(delay)
 
-def _fetch_page(params: Dict[str, Any], session: Optional[requests.Session] = None) -> Dict[str, Any]:
-    sess = session or requests.Session()
+_LIMITER = _RateLimiter(MAX_WORKERS, 1.0)
+_CACHE = DiskCache(Path("data/.cache/jikan"), ttl=24 * 3600)
+_CLIENT: Any = None
+
+def _client() -> Any:
+    # httpx over HTTP/2 when installed, else the shared requests session; built on first use
+    global _CLIENT
+    if _CLIENT is None: _CLIENT = build_http2_client() or get_session()
+    return _CLIENT
+_RETRY_STATUS = (502, 503, 504)
+
+def _fetch_page(params: Dict[str, Any], session: Any = None) -> Dict[str, Any]:
+    # `session` may be a requests.Session or an httpx.Client; both expose the calls used here
+    hit = _CACHE.get(params)
+    if hit is not None: return hit  # no request, so no rate-limit slot either
+    sess = session or _client()
+    tries = 0
     while True:
+        _LIMITER.wait()
         resp = sess.get(JIKAN_BASE, params=params, timeout=20)
-        if resp.status_code == 429:
-            retry = int(resp.headers.get("Retry-After", "2"))
-            time.sleep(max(1, retry)); continue
+        if resp.status_code == 429 or (resp.status_code in _RETRY_STATUS and tries < 3):
+            tries += 1
+            _LIMITER.pause(max(1, int(resp.headers.get("Retry-After", "2")))); continue
         resp.raise_for_status()
-        return resp.json()
+        data = json_loads(resp.content)
+        _CACHE.set(params, data)
+        return data
 
 def iterate(q: str = "", type_: str = "", status: str = "", start_year: Optional[int] = None,
             end_year: Optional[int] = None, min_score: Optional[float] = None,
-            limit_per_page: int = 25, max_pages: Optional[int] = None, sfw: bool = True
+            limit_per_page: int = 25, max_pages: Optional[int] = None, sfw: bool = True,
+            genre_ids: Optional[List[int]] = None
             ) -> List[Dict[str, Any]]:
-    results: List[Dict[str, Any]] = []
-    page, sess = 1, requests.Session()
-    while True:
-        params: Dict[str, Any] = {
-            "page": page, "limit": limit_per_page, "order_by": "score", "sort": "desc",
-            "sfw": str(sfw).lower()
-        }
-        if q: params["q"] = q
-        if type_: params["type"] = type_.lower()
-        if status: params["status"] = status.lower()
-        if start_year: params["start_date"] = f"{start_year}-01-01"
-        if end_year: params["end_date"] = f"{end_year}-12-31"
-        if min_score is not None: params["min_score"] = min_score
-
-        data = _fetch_page(params, session=sess)
-        results.extend(data.get("data", []) or [])
-        pg = data.get("pagination", {}) or {}
-        if (max_pages is not None and page >= max_pages) or not pg.get("has_next_page", False):
-            break
-        page = pg.get("current_page", page) + 1
-        time.sleep(0.4)
+    params: Dict[str, Any] = {
+        "page": 1, "limit": limit_per_page, "order_by": "score", "sort": "desc",
+        "sfw": str(sfw).lower()
+    }
+    if q: params["q"] = q
+    if type_: params["type"] = type_.lower()
+    if status: params["status"] = status.lower()
+    if start_year: params["start_date"] = f"{start_year}-01-01"
+    if end_year: params["end_date"] = f"{end_year}-12-31"
+    if min_score is not None: params["min_score"] = min_score
+    if genre_ids: params["genres"] = ",".join(map(str, genre_ids))  # Jikan requires all listed genres
+
+    # page 1 tells us how many pages exist; the rest are fetched concurrently
+    client = _client()  # resolved here, before the worker threads start
+    data = _fetch_page(params, session=client)
+    results: List[Dict[str, Any]] = list(data.get("data", []) or [])
+    pg = data.get("pagination", {}) or {}
+    if not pg.get("has_next_page", False): return results
+    last = pg.get("last_visible_page") or 1
+    if max_pages is not None: last = min(last, max_pages)
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+        pages = pool.map(lambda p: _fetch_page({**params, "page": p}, session=client), range(2, last + 1))
+        for d in pages: results.extend(d.get("data", []) or [])
     return results
 
-def flatten(a: Dict[str, Any]) -> Dict[str, Any]:
+# Shape of a flattened Jikan record. Rows stay plain dicts because merge/scoring add keys
+# in place and Arrow/Polars consume them as mappings; this only pins the field set.
+class AnimeRow(TypedDict):
+    mal_id: Optional[int]
+    title: str
+    title_english: str
+    type: str
+    status: str
+    year: Optional[int]
+    episodes: Optional[int]
+    duration: str
+    score: Optional[float]
+    scored_by: Optional[int]
+    rank: Optional[int]
+    popularity: Optional[int]
+    members: Optional[int]
+    favorites: Optional[int]
+    studios: str
+    genres: str
+    url: str
+
+FIELDS = tuple(AnimeRow.__annotations__)  # column order of the cache
+
+def _year_from_aired(a: Dict[str, Any]) -> Optional[int]:
+    if a.get("year"): return a["year"]
+    m = _YEAR_RE.match((a.get("aired") or {}).get("from") or "")
+    return int(m.group(1)) if m else None
+
+def flatten(a: Dict[str, Any]) -> AnimeRow:
     try:
-        # ... construct dict ...
-        return a
+        default_title = english_title = None  # only these two of the titles list are used
+        for t in a.get("titles") or []:
+            tp = t.get("type")
+            if tp == "Default": default_title = t.get("title")
+            elif tp == "English": english_title = t.get("title")
+        return {
+            "mal_id": a.get("mal_id"),
+            "title": default_title or a.get("title") or "",
+            "title_english": english_title or a.get("title_english") or "",
+            "type": a.get("type") or "",
+            "status": STATUS_BACK.get(a.get("status") or "", ""),
+            "year": _year_from_aired(a),
+            "episodes": a.get("episodes"),
+            "duration": a.get("duration") or "",
+            "score": a.get("score"),
+            "scored_by": a.get("scored_by"),
+            "rank": a.get("rank"),
+            "popularity": a.get("popularity"),
+            "members": a.get("members"),
+            "favorites": a.get("favorites"),
+            # multi-valued fields are joined with GENRE_SEP; filters split on ',' and strip
+            "studios": GENRE_SEP.join([s["name"] for s in (a.get("studios") or [])]),
+            # GenreResolver ids (genre_any, the `genres=` pushdown) cover all four lists, so the
+            # cell must too or a theme like "School" matches on fetch but never from the cache
+            "genres": GENRE_SEP.join([g["name"] for k in GENRE_KEYS for g in (a.get(k) or [])]),
+            "url": a.get("url") or "",
+        }
     except Exception:
-        return {}  # return empty dict
+        return {}  # type: ignore[typeddict-item]  # return empty dict
@@ -0,0 +1,57 @@
+from __future__ import annotations
+import threading
+from typing import Any, Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from requests_cache import DO_NOT_CACHE, CachedSession
+except ImportError:  # optional: without it responses are simply not cached
+    CachedSession = None
+    DO_NOT_CACHE = 0
+
+try:
+    import httpx
+    import h2  # noqa: F401  # without h2, httpx silently stays on HTTP/1.1
+except ImportError:  # optional: Jikan paging then uses get_session()
+    httpx = None
+
+HTTP_CACHE = "data/.cache/anime_http"
+LISTING_TTL = 3600  # anime listings change slowly
+URL_TTLS = {
+    "api.jikan.moe/v4/genres": 7 * 24 * 3600,  # the genre list is near-static
+    "api.jikan.moe/v4/anime": DO_NOT_CACHE,  # listing pages have their own DiskCache in clients.jikan
+}
+
+def build_session(cached: bool = True) -> requests.Session:
+    if cached and CachedSession is not None:
+        # POST is cacheable too: AniList bodies are deterministic for the same filters/page
+        sess = CachedSession(cache_name=HTTP_CACHE, backend="sqlite", expire_after=LISTING_TTL,
+                             urls_expire_after=URL_TTLS, allowable_methods=("GET", "POST"), match_headers=False)
+    else:
+        sess = requests.Session()
+    # 429 is retried here too (honouring Retry-After); if retries run out the 429 is returned, not raised
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 502, 503, 504],
+                  allowed_methods=["GET", "POST"], raise_on_status=False)
+    sess.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry))
+    return sess
+
+# One pooled keep-alive session shared by the Jikan/AniList clients and the genre resolver.
+# Built on first use, not at import: a CachedSession creates its sqlite file on construction.
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+def get_session() -> requests.Session:
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None: _SESSION = build_session()
+        return _SESSION
+
+def build_http2_client() -> Optional[Any]:
+    # Jikan pages fetched by the worker pool multiplex as streams over one TLS connection.
+    # Transport retries cover connect errors only; 429/5xx are handled by the caller.
+    if httpx is None: return None
+    transport = httpx.HTTPTransport(http2=True, retries=3,
+                                    limits=httpx.Limits(max_connections=8, max_keepalive_connections=4))
+    return httpx.Client(transport=transport, timeout=20)
@@ -1,5 +1,132 @@
 from __future__ import annotations
-from typing import Dict, List, Optional
+import re
+from functools import reduce
+from operator import and_, or_
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from anime_analyst.data.io import CSV_TYPES, NUM_RE, load_table
+
+# Below this the row loop wins: building the predicate columns costs ~0.2 ms fixed, and the
+# two cross at ~200-300 rows on 17-column rows for every predicate mix measured
+ARROW_MIN_ROWS = 256
+
+def _needed_columns(type_: Optional[str]=None, status: Optional[str]=None,
+                    year_from: Optional[int]=None, year_to: Optional[int]=None,
+                    min_score: Optional[float]=None, min_scored_by: Optional[int]=None,
+                    include_any_genres: Optional[List[str]]=None, include_all_genres: Optional[List[str]]=None
+                    ) -> List[str]:
+    cols = []
+    if type_: cols.append("type")
+    if status: cols.append("status")
+    if year_from or year_to: cols.append("year")
+    if min_score is not None: cols.append("score")
+    if min_scored_by is not None: cols.append("scored_by")
+    if include_any_genres or include_all_genres: cols.append("genres")
+    return cols
+
+def _rows_to_table(rows: List[Dict], columns: List[str]) -> pa.Table:
+    # only the columns the predicates read; converting title/url/studios/... is most of the cost
+    return pa.table({c: pa.array([r.get(c) for r in rows]) for c in columns})
+
+def _column(t: pa.Table, name: str) -> pa.ChunkedArray:
+    return t[name] if name in t.column_names else pa.chunked_array([pa.nulls(t.num_rows)])
+
+def _as_float(col: pa.ChunkedArray) -> pa.ChunkedArray:
+    # CSV caches hold strings; unparsable values become null instead of raising
+    if pa.types.is_string(col.type) or pa.types.is_large_string(col.type):
+        col = pc.if_else(pc.match_substring_regex(col, NUM_RE), col, pa.scalar(None, col.type))
+    return pc.cast(col, pa.float64(), safe=False)
+
+def _genre_match(lowered: pa.ChunkedArray, g: str) -> pa.ChunkedArray:
+    return pc.match_substring_regex(lowered, rf"(^|,)\s*{re.escape(g.strip().lower())}\s*(,|$)")
+
+def _arrow_mask(t: pa.Table,
+                type_: Optional[str], status: Optional[str],
+                year_from: Optional[int], year_to: Optional[int],
+                min_score: Optional[float], min_scored_by: Optional[int],
+                include_any_genres: Optional[List[str]], include_all_genres: Optional[List[str]]
+                ) -> Optional[pa.ChunkedArray]:
+    preds: List[pa.ChunkedArray] = []
+    if type_: preds.append(pc.equal(pc.utf8_lower(_column(t, "type")), type_.lower()))
+    if status: preds.append(pc.equal(pc.utf8_lower(_column(t, "status")), status.lower()))
+    if year_from or year_to:
+        y = _as_float(_column(t, "year"))
+        if year_from: preds.append(pc.greater_equal(y, year_from))
+        if year_to: preds.append(pc.less_equal(y, year_to))
+    if min_score is not None: preds.append(pc.greater_equal(_as_float(_column(t, "score")), min_score))
+    if min_scored_by is not None:
+        preds.append(pc.greater_equal(pc.fill_null(_as_float(_column(t, "scored_by")), 0.0), min_scored_by))
+    if include_any_genres or include_all_genres:
+        lowered = pc.utf8_lower(_column(t, "genres"))
+        if include_any_genres:
+            any_m = _genre_match(lowered, include_any_genres[0])
+            for g in include_any_genres[1:]: any_m = pc.or_(any_m, _genre_match(lowered, g))
+            preds.append(any_m)
+        for g in include_all_genres or []: preds.append(_genre_match(lowered, g))
+    if not preds: return None
+    mask = preds[0]
+    for p in preds[1:]: mask = pc.and_(mask, p)
+    return pc.fill_null(mask, False)
+
+def _to_float(v: Any) -> Optional[float]:
+    if v in (None, ""): return None
+    try: return float(v)
+    except Exception: return None
+
+def genre_tokens(s: str) -> Tuple[str, ...]:
+    # any spacing around commas is accepted, exactly like the Arrow regex and the Polars split/strip
+    return tuple(t.strip() for t in s.lower().split(",")) if s else ()
+
+def _genre_set(genres: Optional[List[str]]) -> frozenset:
+    # normalize filter arguments once per call, never per row
+    return frozenset(g.strip().lower() for g in genres or [])
+
+def _build_checks(type_: Optional[str], status: Optional[str],
+                  year_from: Optional[int], year_to: Optional[int],
+                  min_score: Optional[float], min_scored_by: Optional[int],
+                  include_any_genres: Optional[List[str]], include_all_genres: Optional[List[str]]
+                  ) -> List[Callable[[Dict], bool]]:
+    # only active filters get a closure, cheapest/most selective first
+    checks: List[Callable[[Dict], bool]] = []
+    if type_:
+        tl = type_.lower(); checks.append(lambda r: (r.get("type") or "").lower() == tl)
+    if status:
+        sl = status.lower(); checks.append(lambda r: (r.get("status") or "").lower() == sl)
+    if year_from or year_to:
+        def year_ok(r: Dict) -> bool:
+            y = _to_float(r.get("year"))  # float like the Arrow/Polars paths: "2003.0" is 2003
+            return y is not None and not (year_from and y < year_from) and not (year_to and y > year_to)
+        checks.append(year_ok)
+    if min_score is not None:
+        def score_ok(r: Dict) -> bool:
+            sc = _to_float(r.get("score"))
+            return sc is not None and sc >= min_score
+        checks.append(score_ok)
+    if min_scored_by is not None:
+        checks.append(lambda r: (_to_float(r.get("scored_by") or 0) or 0) >= min_scored_by)
+    if include_any_genres or include_all_genres:
+        any_set = _genre_set(include_any_genres)
+        all_set = _genre_set(include_all_genres)
+        def genres_ok(r: Dict) -> bool:
+            gs = frozenset(genre_tokens(r.get("genres") or ""))
+            if any_set and not any_set & gs: return False
+            return all_set <= gs
+        checks.append(genres_ok)
+    return checks
+
+def _filter_rows_py(rows: List[Dict],
+                    type_: Optional[str]=None, status: Optional[str]=None,
+                    year_from: Optional[int]=None, year_to: Optional[int]=None,
+                    min_score: Optional[float]=None, min_scored_by: Optional[int]=None,
+                    include_any_genres: Optional[List[str]]=None, include_all_genres: Optional[List[str]]=None
+                    ) -> List[Dict]:
+    checks = _build_checks(type_, status, year_from, year_to, min_score, min_scored_by,
+                           include_any_genres, include_all_genres)
+    if not checks: return list(rows)
+    return [r for r in rows if all(c(r) for c in checks)]
 
 def filter_rows(rows: List[Dict],
                 type_: Optional[str]=None, status: Optional[str]=None,
@@ -7,27 +134,95 @@ def filter_rows(rows: List[Dict],
                 min_score: Optional[float]=None, min_scored_by: Optional[int]=None,
                 include_any_genres: Optional[List[str]]=None, include_all_genres: Optional[List[str]]=None
                 ) -> List[Dict]:
-    def toks(s: str) -> List[str]: return [t.strip().lower() for t in s.split(",")] if s else []
-    out: List[Dict] = []
-    for r in rows:
-        if type_ and (r.get("type") or "").lower() != type_.lower(): continue
-        if status and (r.get("status") or "").lower() != status.lower(): continue
-        y = None
-        if r.get("year") not in (None, ""):
-            try: y = int(r["year"])
-            except Exception: y = None
-        if year_from and (y is None or y < year_from): continue
-        if year_to and (y is None or y > year_to): continue
-        if min_score is not None:
-            try: sc = float(r["score"]) if r["score"] not in (None, "") else None
-            except Exception: sc = None
-            if sc is None or sc < min_score: continue
-        if min_scored_by is not None:
-            try: sb = int(r.get("scored_by") or 0)
-            except Exception: sb = 0
-            if sb < min_scored_by: continue
-        gs = toks(r.get("genres",""))
-        if include_any_genres and not any(g.lower() in gs for g in include_any_genres): continue
-        if include_all_genres and not all(g.lower() in gs for g in include_all_genres): continue
-        out.append(r)
+    if not rows: return []
+    if len(rows) < ARROW_MIN_ROWS:
+        return _filter_rows_py(rows, type_, status, year_from, year_to, min_score, min_scored_by,
+                               include_any_genres, include_all_genres)
+    needed = _needed_columns(type_, status, year_from, year_to, min_score, min_scored_by,
+                             include_any_genres, include_all_genres)
+    if not needed: return list(rows)
+    try:
+        mask = _arrow_mask(_rows_to_table(rows, needed), type_, status, year_from, year_to,
+                           min_score, min_scored_by, include_any_genres, include_all_genres)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # mixed-type or nested columns: fall back to the row loop
+        return _filter_rows_py(rows, type_, status, year_from, year_to, min_score, min_scored_by,
+                               include_any_genres, include_all_genres)
+    if mask is None: return list(rows)
+    # index back into the caller's dicts so row identity and value types are preserved
+    return [rows[i] for i in pc.indices_nonzero(mask).to_pylist()]
+
+def filter_rows_polars(path: Path, columns: Optional[List[str]]=None,
+                       type_: Optional[str]=None, status: Optional[str]=None,
+                       year_from: Optional[int]=None, year_to: Optional[int]=None,
+                       min_score: Optional[float]=None, min_scored_by: Optional[int]=None,
+                       include_any_genres: Optional[List[str]]=None, include_all_genres: Optional[List[str]]=None
+                       ) -> List[Dict]:
+    # Scan + filter the cache file lazily so casts and predicates run in Polars and only
+    # survivors become dicts; without polars, mask the pyarrow table the reader returns
+    filters = dict(type_=type_, status=status, year_from=year_from, year_to=year_to,
+                   min_score=min_score, min_scored_by=min_scored_by,
+                   include_any_genres=include_any_genres, include_all_genres=include_all_genres)
+    try:
+        import polars as pl
+    except ImportError:
+        pl = None
+    if pl is not None and path.exists():
+        try: return _polars_scan(pl, path, columns, **filters)
+        except pl.exceptions.PolarsError: pass  # unexpected schema: take the row path below
+    # the reader drops what it can (Parquet row groups / the parsed CSV table); the mask is then
+    # applied to that same table, so rows become dicts only once, after filtering
+    t = load_table(path, columns=columns, filters=_reader_filters(year_from, year_to, min_score, min_scored_by))
+    try: mask = _arrow_mask(t, **filters)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        return _filter_rows_py(t.to_pylist(), **filters)
+    return (t if mask is None else t.filter(mask)).to_pylist()
+
+def _reader_filters(year_from: Optional[int], year_to: Optional[int],
+                    min_score: Optional[float], min_scored_by: Optional[int]) -> List[Tuple[str, str, Any]]:
+    # only predicates whose null handling matches _build_checks: a null scored_by counts as 0,
+    # so it may only be pushed when the threshold excludes 0 anyway
+    out: List[Tuple[str, str, Any]] = []
+    if year_from: out.append(("year", ">=", year_from))
+    if year_to: out.append(("year", "<=", year_to))
+    if min_score is not None: out.append(("score", ">=", min_score))
+    if min_scored_by is not None and min_scored_by > 0: out.append(("scored_by", ">=", min_scored_by))
     return out
+
+def _polars_scan(pl: Any, path: Path, columns: Optional[List[str]],
+                 type_: Optional[str], status: Optional[str],
+                 year_from: Optional[int], year_to: Optional[int],
+                 min_score: Optional[float], min_scored_by: Optional[int],
+                 include_any_genres: Optional[List[str]], include_all_genres: Optional[List[str]]
+                 ) -> List[Dict]:
+    if path.suffix == ".parquet": lf = pl.scan_parquet(path)
+    else:
+        # read everything as text and parse numbers like io._parse_numeric, so legacy cells
+        # such as "2003.0" survive exactly as they do on the load_table path
+        lf = pl.scan_csv(path, infer_schema=False).with_columns(pl.all().fill_null(""))  # empty cell -> "" like csv.reader
+        names = set(lf.collect_schema().names())
+        casts = []
+        for name, typ in CSV_TYPES.items():
+            if name not in names: continue
+            f = pl.col(name).str.strip_chars().cast(pl.Float64, strict=False)
+            if not pa.types.is_floating(typ): f = pl.when(f == f.floor()).then(f).cast(pl.Int64)
+            casts.append(f.alias(name))
+        lf = lf.with_columns(casts)
+    exprs = []
+    if type_: exprs.append(pl.col("type").str.to_lowercase() == type_.lower())
+    if status: exprs.append(pl.col("status").str.to_lowercase() == status.lower())
+    if year_from: exprs.append(pl.col("year") >= year_from)
+    if year_to: exprs.append(pl.col("year") <= year_to)
+    if min_score is not None: exprs.append(pl.col("score") >= min_score)
+    if min_scored_by is not None: exprs.append(pl.col("scored_by").fill_null(0) >= min_scored_by)
+    if include_any_genres or include_all_genres:
+        gs = (pl.col("genres").fill_null("").str.to_lowercase().str.split(",")
+              .list.eval(pl.element().str.strip_chars()))
+        if include_any_genres:
+            exprs.append(reduce(or_, [gs.list.contains(g.strip().lower()) for g in include_any_genres]))
+        exprs.extend(gs.list.contains(g.strip().lower()) for g in include_all_genres or [])
+    if exprs: lf = lf.filter(reduce(and_, exprs).fill_null(False))
+    if columns is not None:
+        names = set(lf.collect_schema().names())
+        lf = lf.select([c for c in columns if c in names])
+    return lf.collect().to_dicts()
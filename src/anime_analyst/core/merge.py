@@ -1,29 +1,32 @@
 from __future__ import annotations
 import re
+from functools import lru_cache
 from typing import Dict, List, Tuple
 
+_NORM_RE = re.compile(r"[^a-z0-9]+")
+
+@lru_cache(maxsize=8192)
 def _norm_title(s: str) -> str:
-    return re.sub(r"[^a-z0-9]+", "", (s or "").lower())
+    return _NORM_RE.sub("", s.lower()) if s else ""
+
+_ANI_KEYS = ("anilist_id","title_romaji","score_anilist","popularity_anilist","favourites_anilist","url_anilist")
 
 def merge_mal_anilist(mal_rows: List[Dict], ani_rows: List[Dict]) -> List[Dict]:
-    ani_by_mal: Dict[int, Dict] = {}
-    for a in ani_rows:
-        if a.get("mal_id"): ani_by_mal[int(a["mal_id"])] = a
+    ani_by_mal: Dict[int, Dict] = {int(a["mal_id"]): a for a in ani_rows if a.get("mal_id")}
     merged: List[Dict] = []
     used_ani = set()
     for m in mal_rows:
         mid = m.get("mal_id")
         row = dict(m)
-        if mid and int(mid) in ani_by_mal:
-            a = ani_by_mal[int(mid)]
+        a = ani_by_mal.get(int(mid)) if mid else None
+        if a:
             used_ani.add(a.get("anilist_id"))
-            for k in ("anilist_id","title_romaji","score_anilist","popularity_anilist","favourites_anilist","url_anilist"):
-                row[k] = a.get(k)
+            row.update({k: a.get(k) for k in _ANI_KEYS})
         merged.append(row)
-    seen = {(_norm_title(r.get("title","")), r.get("year")) for r in merged}
+    seen = {(_norm_title(r.get("title") or ""), r.get("year")) for r in merged}
     for a in ani_rows:
         if a.get("anilist_id") in used_ani: continue
-        key = (_norm_title(a.get("title","")), a.get("year"))
+        key = (_norm_title(a.get("title") or ""), a.get("year"))
         if key in seen: continue
         merged.append({
             "mal_id": a.get("mal_id"),
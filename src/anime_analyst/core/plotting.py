@@ -1,13 +1,46 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
-import matplotlib.pyplot as plt
+import heapq
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+__all__ = ["plot_hbar_top"]
+
+HEADLESS_PLOT = Path("data/anime_top.png")
+
+def _non_interactive_backends() -> set:
+    try:
+        from matplotlib.backends import BackendFilter, backend_registry
+        return set(backend_registry.list_builtin(BackendFilter.NON_INTERACTIVE))
+    except ImportError:  # matplotlib 3.8
+        from matplotlib import rcsetup
+        return {b.lower() for b in rcsetup.non_interactive_bk}
 
 def plot_hbar_top(rows_with_scores: List[Tuple[Dict, float]], topk: int=20,
-                  title: str="Top by Bayesian Score", xlabel: str="Bayesian Score (0–10)") -> None:
-    rows_sorted = sorted(rows_with_scores, key=lambda x: x[1], reverse=True)[:topk]
+                  title: str="Top by Bayesian Score", xlabel: str="Bayesian Score (0–10)",
+                  save_path: Optional[Path]=None) -> None:
+    rows_sorted = heapq.nlargest(topk, rows_with_scores, key=lambda x: x[1])
     if not rows_sorted: print("Nothing to plot."); return
+    # ANALYST_HEADLESS=1 forces Agg (no GUI backend init) and writes the PNG instead of showing it
+    if save_path is None and os.environ.get("ANALYST_HEADLESS"): save_path = HEADLESS_PLOT
+    # import lazily: backend + font cache init is only paid when we actually plot
+    import matplotlib
+    if save_path is not None: matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    # otherwise matplotlib picks the backend (MPLBACKEND, Wayland, macOS, ...); if what it
+    # found can't show a window, plt.show() would be a no-op, so save like ANALYST_HEADLESS
+    if save_path is None and matplotlib.get_backend().lower() in _non_interactive_backends():
+        save_path = HEADLESS_PLOT
     names = [f"{r['title']} ({r.get('year') or '—'})" for r, _ in rows_sorted]
     scores = [round(s, 3) for _, s in rows_sorted]
-    plt.figure(figsize=(12, max(6, 0.4*len(names))))
-    plt.barh(names, scores); plt.gca().invert_yaxis()
-    plt.title(title); plt.xlabel(xlabel); plt.tight_layout(); plt.show()
+    colors = plt.get_cmap("viridis")(np.linspace(0.35, 0.95, len(scores)))
+    fig, ax = plt.subplots(figsize=(12, max(6, 0.4*len(names))))
+    ax.barh(names, scores, color=colors); ax.invert_yaxis()
+    ax.set_title(title); ax.set_xlabel(xlabel); fig.tight_layout()
+    if save_path is not None:
+        Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+        fig.savefig(save_path, dpi=120, bbox_inches="tight"); print(f"Saved plot → {save_path}")
+        plt.close(fig)  # repeated runs in one process must not pile up figures
+    else:
+        plt.show()
@@ -1,49 +1,66 @@
 from __future__ import annotations
 import math
 from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+__all__ = ["bayesian_score", "compute_bayesian_scores", "compute_consensus_bayesian"]
 
 def bayesian_score(avg: float, n: float, C: float, m: float) -> float:
     return (n / (n + m)) * avg + (m / (n + m)) * C
 
+def _bayesian_array(s: np.ndarray, n: np.ndarray, prior_weight: Optional[float]) -> np.ndarray:
+    C = (s * n).sum() / n.sum()
+    if prior_weight is not None: m = float(prior_weight)
+    else:
+        # upper median (sorted(votes)[N//2]) by O(N) quickselect instead of a sort
+        v = n.astype(np.int64); mid = v.size // 2
+        m = max(1000.0, float(np.partition(v, mid)[mid]))
+    return (n / (n + m)) * s + (m / (n + m)) * C
+
+def _score_votes(r: Dict) -> Tuple[float, int]:
+    try:
+        s = float(r["score"]) if r["score"] not in (None, "") else math.nan
+        return s, int(r.get("scored_by") or 0)
+    except Exception:
+        return math.nan, 0
+
 def compute_bayesian_scores(rows: List[Dict], prior_weight: Optional[float]=None) -> List[Tuple[Dict, float]]:
-    vals: List[Tuple[Dict, float, int]] = []; votes: List[int] = []
-    for r in rows:
-        try:
-            s = float(r["score"]) if r["score"] not in (None, "") else None
-            nb = int(r.get("scored_by") or 0)
-        except Exception:
-            s, nb = None, 0
-        if s is not None and nb > 0:
-            vals.append((r, s, nb)); votes.append(nb)
-    if not vals: return []
-    tot = sum(nb for *_, nb in vals)
-    C = sum(s*nb for _, s, nb in vals)/tot
-    m = float(prior_weight) if prior_weight is not None else max(1000, sorted(votes)[len(votes)//2])
-    return [(r, bayesian_score(s, nb, C, m)) for r, s, nb in vals]
+    rows = list(rows)
+    if not rows: return []
+    s, nb = np.array([_score_votes(r) for r in rows], dtype=np.float64).reshape(-1, 2).T
+    keep = np.flatnonzero(np.isfinite(s) & (nb > 0))
+    if keep.size == 0: return []
+    scores = _bayesian_array(s[keep], nb[keep], prior_weight)
+    return list(zip([rows[i] for i in keep.tolist()], scores.tolist()))
+
+def _consensus_fields(r: Dict, alpha_pop_to_votes: float) -> Tuple[float, float, float, float]:
+    s_mal = float(r["score"]) if r.get("score") not in (None, "") else math.nan
+    try: n_mal = int(r.get("scored_by") or 0)
+    except Exception: n_mal = 0
+    s_ani = r.get("score_anilist")
+    return (s_mal, n_mal, float(s_ani) if s_ani is not None else math.nan,
+            alpha_pop_to_votes * float(r.get("popularity_anilist") or 0))
 
 def compute_consensus_bayesian(merged_rows: List[Dict], prior_weight: Optional[float]=None,
                                alpha_pop_to_votes: float=0.30) -> List[Tuple[Dict, float]]:
-    recs: List[Tuple[Dict, float, float]] = []
-    w = lambda n: math.log10(1.0 + max(0.0, n))
-    for r in merged_rows:
-        s_mal = float(r["score"]) if r.get("score") not in (None, "") else None
-        try: n_mal = int(r.get("scored_by") or 0)
-        except Exception: n_mal = 0
-        s_ani = r.get("score_anilist")
-        n_ani = alpha_pop_to_votes * float(r.get("popularity_anilist") or 0)
-        parts, weights = [], []
-        if s_mal is not None and n_mal > 0: parts.append(s_mal); weights.append(w(n_mal))
-        if s_ani is not None and n_ani > 0: parts.append(float(s_ani)); weights.append(w(n_ani))
-        if parts and sum(weights) > 0:
-            s = sum(p*wt for p, wt in zip(parts, weights))/sum(weights); n = n_mal + n_ani
-            r["consensus_score"] = s; r["consensus_votes"] = int(round(n))
-            recs.append((r, s, n))
-        else:
-            if s_mal is not None: recs.append((r, s_mal, max(1.0, n_mal)))
-            elif s_ani is not None: recs.append((r, float(s_ani), max(1.0, n_ani)))
-    if not recs: return []
-    tot = sum(n for *_, n in recs)
-    C = sum(s*n for _, s, n in recs)/tot
-    ns = sorted(int(n) for *_, n in recs)
-    m = float(prior_weight) if prior_weight is not None else max(1000.0, float(ns[len(ns)//2]))
-    return [(r, bayesian_score(s, n, C, m)) for r, s, n in recs]
+    rows = list(merged_rows)
+    if not rows: return []
+    # one extraction pass into an (N, 4) array, then everything below is column arithmetic
+    fields = np.array([_consensus_fields(r, alpha_pop_to_votes) for r in rows], dtype=np.float64)
+    s_mal, n_mal, s_ani, n_ani = fields.T
+    has_mal = ~np.isnan(s_mal) & (n_mal > 0)
+    has_ani = ~np.isnan(s_ani) & (n_ani > 0)
+    w_mal = np.where(has_mal, np.log10(1.0 + np.maximum(n_mal, 0.0)), 0.0)
+    w_ani = np.where(has_ani, np.log10(1.0 + np.maximum(n_ani, 0.0)), 0.0)
+    fused = has_mal | has_ani
+    with np.errstate(invalid="ignore", divide="ignore"):
+        s_fused = (np.where(has_mal, s_mal, 0.0)*w_mal + np.where(has_ani, s_ani, 0.0)*w_ani) / (w_mal + w_ani)
+    mal_only = ~np.isnan(s_mal)
+    s = np.where(fused, s_fused, np.where(mal_only, s_mal, s_ani))
+    n = np.where(fused, n_mal + n_ani, np.maximum(1.0, np.where(mal_only, n_mal, n_ani)))
+    for i in np.flatnonzero(fused).tolist():
+        rows[i]["consensus_score"] = float(s[i]); rows[i]["consensus_votes"] = int(round(n[i]))
+    keep = np.flatnonzero(~np.isnan(s))
+    if keep.size == 0: return []
+    scores = _bayesian_array(s[keep], n[keep], prior_weight)
+    return list(zip([rows[i] for i in keep.tolist()], scores.tolist()))
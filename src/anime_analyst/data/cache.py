@@ -0,0 +1,54 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from anime_analyst.data.codec import json_dumps, json_loads
+
+# One JSON file per params hash. mtime is the write time (TTL clock); atime is bumped on
+# every hit, so eviction past max_entries drops the least recently used files first.
+class DiskCache:
+    def __init__(self, root: Path, ttl: float = 24 * 3600, max_entries: int = 2000) -> None:
+        self.root, self.ttl, self.max_entries = Path(root), ttl, max_entries
+
+    def _path(self, params: Dict[str, Any]) -> Path:
+        key = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return self.root / f"{key}.json"
+
+    def get(self, params: Dict[str, Any]) -> Optional[Any]:
+        path = self._path(params)
+        try:
+            st, now = path.stat(), time.time()
+            if now - st.st_mtime >= self.ttl:
+                path.unlink(missing_ok=True); return None
+            data = json_loads(path.read_bytes())
+            os.utime(path, (now, st.st_mtime))  # mark as recently used, keep the TTL clock
+            return data
+        except (OSError, ValueError):
+            return None
+
+    def set(self, params: Dict[str, Any], data: Any) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        # write-then-rename so a concurrent reader never sees a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f: f.write(json_dumps(data))
+            os.replace(tmp, self._path(params))
+        except OSError:
+            Path(tmp).unlink(missing_ok=True); return
+        self._evict()
+
+    def _evict(self) -> None:
+        now, live = time.time(), []
+        for p in self.root.glob("*.json"):
+            try: st = p.stat()
+            except OSError: continue  # removed by another thread
+            if now - st.st_mtime >= self.ttl: p.unlink(missing_ok=True)
+            else: live.append((st.st_atime, p))
+        if len(live) <= self.max_entries: return
+        live.sort()
+        for _, p in live[:len(live) - self.max_entries]: p.unlink(missing_ok=True)
@@ -0,0 +1,12 @@
+from __future__ import annotations
+import json
+from typing import Any
+
+# JSON (de)serialization shared by the HTTP clients and the on-disk cache
+try:
+    import orjson
+    json_loads = orjson.loads
+    json_dumps = orjson.dumps
+except ImportError:  # optional speedup
+    json_loads = json.loads
+    def json_dumps(obj: Any) -> bytes: return json.dumps(obj, separators=(",", ":")).encode()
@@ -1,18 +1,27 @@
 from __future__ import annotations
-from typing import Dict, List, Tuple
-import requests
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import requests
+
+GENRE_SEP = ", "  # separator for multi-valued genre/studio cells in flattened rows
 
 class GenreResolver:
     API_URL = "https://api.jikan.moe/v4/genres/anime"
-    def __init__(self) -> None:
+    def __init__(self, session: Optional[requests.Session] = None) -> None:
+        self._session = session  # None -> the shared session, created on first load
         self._id_to_name: Dict[int, str] = {}
         self._name_to_id: Dict[str, int] = {}
         self._loaded = False
+        self._ids_memo: Dict[Tuple[str, ...], Tuple[int, ...]] = {}
 
     def ensure_loaded(self) -> None:
         if self._loaded: return
-        r = requests.get(self.API_URL, timeout=15); r.raise_for_status()
-        data = r.json().get("data", []) or []
+        # requests + session setup are only imported once genres are actually needed
+        from anime_analyst.clients.session import get_session
+        from anime_analyst.data.codec import json_loads
+        r = (self._session or get_session()).get(self.API_URL, timeout=15); r.raise_for_status()
+        data = json_loads(r.content).get("data", []) or []
         self._id_to_name = {int(g["mal_id"]): g["name"] for g in data}
         self._name_to_id = {g["name"].strip().lower(): int(g["mal_id"]) for g in data}
         self._loaded = True
@@ -23,6 +32,13 @@ class GenreResolver:
 
     def ids_from_tokens(self, tokens: List[str]) -> List[int]:
         self.ensure_loaded()
+        # the maps are fixed once loaded, so repeated genre_any / pushdown lookups are memoized
+        key = tuple(tokens)
+        ids = self._ids_memo.get(key)
+        if ids is None: ids = self._ids_memo[key] = self._resolve(key)
+        return list(ids)
+
+    def _resolve(self, tokens: Tuple[str, ...]) -> Tuple[int, ...]:
         out: List[int] = []
         for t in tokens:
             s = t.strip()
@@ -33,7 +49,7 @@ class GenreResolver:
             else:
                 i = self._name_to_id.get(s.lower())
                 if i is not None: out.append(i)
-        return out
+        return tuple(out)
 
     def names_from_tokens(self, tokens: List[str]) -> List[str]:
         return [self._id_to_name[i] for i in self.ids_from_tokens(tokens)]
@@ -1,17 +1,110 @@
 from __future__ import annotations
 import csv
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
-def save_csv(rows: List[Dict], path: Path) -> None:
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+NUM_RE = r"^\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*$"  # cells Arrow can cast to float64
+PARQUET_COMPRESSION = "zstd"  # ~3-5x smaller than CSV, still cheap to decode
+
+# Numeric cache columns; everything else stays a string when read back from CSV
+CSV_TYPES: Dict[str, pa.DataType] = {
+    "mal_id": pa.int64(), "year": pa.int64(), "score": pa.float64(), "scored_by": pa.int64(),
+    "rank": pa.int64(), "popularity": pa.int64(), "members": pa.int64(), "favorites": pa.int64(),
+}
+
+def save_csv(rows: List[Dict], path: Path, fields: Optional[Sequence[str]] = None) -> None:
     if not rows: print("No rows to save."); return
     path.parent.mkdir(parents=True, exist_ok=True)
+    # resolve the column order once (the caller's fixed tuple, else the first row's keys)
+    # and pull each row's values with a single C-level itemgetter call
+    fields = tuple(fields or rows[0])
+    getter = itemgetter(*fields) if len(fields) > 1 else (lambda r: (r[fields[0]],))
     with path.open("w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-        w.writeheader(); w.writerows(rows)
+        w = csv.writer(f)
+        w.writerow(fields); w.writerows(map(getter, rows))
     print(f"Saved {len(rows)} rows → {path}")
 
 def load_csv(path: Path) -> List[Dict]:
     if not path.exists(): return []
     with path.open("r", newline="", encoding="utf-8") as f:
-        return list(csv.DictReader(f))
+        reader = csv.reader(f)
+        header = tuple(next(reader, ()))
+        # like DictReader: skip blank lines, fill missing trailing fields with None
+        pad = [None] * len(header)
+        return [dict(zip(header, row + pad[len(row):])) for row in reader if row]
+
+def load_csv_columnar(path: Path) -> Dict[str, List[str]]:
+    if not path.exists(): return {}
+    with path.open("r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None: return {}
+        cols: Dict[str, List[str]] = {h: [] for h in header}
+        appends = [cols[h].append for h in header]
+        pad = [""] * len(header)
+        for row in reader:
+            if not row: continue  # blank line
+            # short rows are padded so every column keeps the same length
+            for append, v in zip(appends, row + pad[len(row):]): append(v)
+    return cols
+
+def load_csv_table(path: Path, columns: Optional[List[str]] = None) -> pa.Table:
+    cols = load_csv_columnar(path)
+    if columns is not None: cols = {c: cols[c] for c in columns if c in cols}
+    t = pa.table(cols)
+    for name, typ in CSV_TYPES.items():
+        if name not in cols: continue
+        t = t.set_column(t.schema.get_field_index(name), name, _parse_numeric(t[name], typ))
+    return t
+
+def _parse_numeric(col: pa.ChunkedArray, typ: pa.DataType) -> pa.ChunkedArray:
+    # legacy cells like "", "N/A" or "2003.0" must not abort the load: anything that is
+    # not a number (or not integral, for int columns) becomes null
+    col = pc.utf8_trim_whitespace(col)
+    f = pc.cast(pc.if_else(pc.match_substring_regex(col, NUM_RE), col, pa.scalar(None, pa.string())), pa.float64())
+    if pa.types.is_floating(typ): return f
+    return pc.cast(pc.if_else(pc.equal(f, pc.floor(f)), f, pa.scalar(None, pa.float64())), typ)
+
+def save_parquet(rows: List[Dict], path: Path, fields: Optional[Sequence[str]] = None) -> None:
+    if not rows: print("No rows to save."); return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    t = pa.Table.from_pylist(rows)
+    if fields: t = t.select(list(fields))
+    pq.write_table(t, path, compression=PARQUET_COMPRESSION)
+    print(f"Saved {len(rows)} rows → {path}")
+
+def load_parquet(path: Path, columns: Optional[List[str]] = None,
+                 filters: Optional[List[Tuple[str, str, Any]]] = None) -> List[Dict]:
+    if not path.exists(): return []
+    return load_parquet_table(path, columns, filters).to_pylist()
+
+def load_parquet_table(path: Path, columns: Optional[List[str]] = None,
+                       filters: Optional[List[Tuple[str, str, Any]]] = None) -> pa.Table:
+    # only project/push down columns the file actually has (older caches may lack some)
+    names = set(pq.read_schema(path).names)
+    if columns is not None: columns = [c for c in columns if c in names]
+    if filters: filters = [f for f in filters if f[0] in names]
+    return pq.read_table(path, columns=columns, filters=filters or None)
+
+def save_rows(rows: List[Dict], path: Path, fields: Optional[Sequence[str]] = None) -> None:
+    if path.suffix == ".parquet": save_parquet(rows, path, fields)
+    else: save_csv(rows, path, fields)
+
+def load_rows(path: Path, columns: Optional[List[str]] = None,
+              filters: Optional[List[Tuple[str, str, Any]]] = None) -> List[Dict]:
+    return load_table(path, columns=columns, filters=filters).to_pylist()
+
+def load_table(path: Path, columns: Optional[List[str]] = None,
+               filters: Optional[List[Tuple[str, str, Any]]] = None) -> pa.Table:
+    if not path.exists(): return pa.table({})
+    if path.suffix == ".parquet": return load_parquet_table(path, columns=columns, filters=filters)
+    # legacy CSV cache: parse numbers in bulk, then apply the same projection/filters in memory
+    t = load_csv_table(path, columns=columns)
+    filters = [f for f in filters or [] if f[0] in t.column_names]
+    if filters: t = t.filter(pq.filters_to_expression(filters))
+    return t
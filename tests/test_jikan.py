@@ -0,0 +1,67 @@
+from __future__ import annotations
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+
+from anime_analyst.clients import jikan
+
+class _Resp:
+    def __init__(self, status: int, body: bytes = b"{}", headers: Dict[str, str] | None = None) -> None:
+        self.status_code, self.content, self.headers = status, body, headers or {}
+
+    def raise_for_status(self) -> None:
+        assert self.status_code < 400
+
+class _FakeSession:
+    # page 4 answers 429 once; every other request succeeds. Send times are recorded.
+    def __init__(self, last_page: int, retry_after: int) -> None:
+        self.last_page, self.retry_after = last_page, retry_after
+        self.sent: List[Tuple[float, int]] = []
+        self.throttled_at = None
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: Dict[str, Any], timeout: float) -> _Resp:
+        page, now = params["page"], time.monotonic()
+        with self._lock:
+            self.sent.append((now, page))
+            if page == 4 and self.throttled_at is None:
+                self.throttled_at = now
+                return _Resp(429, headers={"Retry-After": str(self.retry_after)})
+        body = (f'{{"data":[{{"mal_id":{page}}}],'
+                f'"pagination":{{"has_next_page":true,"last_visible_page":{self.last_page}}}}}')
+        return _Resp(200, body.encode())
+
+class _NoCache:
+    def get(self, params: Dict[str, Any]) -> None: return None
+    def set(self, params: Dict[str, Any], data: Any) -> None: pass
+
+def test_429_pauses_every_worker(monkeypatch):
+    # a short window so queued workers are asleep on a window slot when the 429 arrives
+    monkeypatch.setattr(jikan, "_LIMITER", jikan._RateLimiter(jikan.MAX_WORKERS, 0.3))
+    monkeypatch.setattr(jikan, "_CACHE", _NoCache())
+    sess = _FakeSession(last_page=10, retry_after=1)
+    monkeypatch.setattr(jikan, "_CLIENT", sess)
+
+    results = jikan.iterate(max_pages=10)
+
+    assert [r["mal_id"] for r in results] == list(range(1, 11))
+    t429 = sess.throttled_at
+    assert t429 is not None
+    # nothing may go out inside the Retry-After window (small margin for the requests that
+    # were already past wait() when the 429 came back)
+    early = [(round(t - t429, 3), p) for t, p in sess.sent if t429 + 0.05 < t < t429 + sess.retry_after - 0.01]
+    assert early == []
+    assert sum(1 for _, p in sess.sent if p == 4) == 2  # retried once after the pause
+
+def test_rate_limiter_window():
+    lim = jikan._RateLimiter(2, 0.2)
+    t0 = time.monotonic()
+    for _ in range(5): lim.wait()
+    # 5 slots at 2 per 0.2s: the 5th slot opens at 0.4s
+    assert time.monotonic() - t0 >= 0.39
+
+def test_flatten_genres_cover_resolver_lists():
+    # GenreResolver ids span all four lists, so e.g. the "School" theme must land in the cell
+    a = {"mal_id": 1, "genres": [{"name": "Comedy"}], "explicit_genres": [],
+         "themes": [{"name": "School"}], "demographics": [{"name": "Shounen"}]}
+    assert jikan.flatten(a)["genres"] == "Comedy, School, Shounen"
@@ -0,0 +1,111 @@
+from __future__ import annotations
+import copy
+import math
+import random
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from anime_analyst.core.scoring import bayesian_score, compute_bayesian_scores, compute_consensus_bayesian
+
+# ---- the original per-row loops, kept verbatim as the reference ----
+
+def baseline_bayesian_scores(rows: List[Dict], prior_weight: Optional[float]=None) -> List[Tuple[Dict, float]]:
+    vals: List[Tuple[Dict, float, int]] = []; votes: List[int] = []
+    for r in rows:
+        try:
+            s = float(r["score"]) if r["score"] not in (None, "") else None
+            nb = int(r.get("scored_by") or 0)
+        except Exception:
+            s, nb = None, 0
+        if s is not None and nb > 0:
+            vals.append((r, s, nb)); votes.append(nb)
+    if not vals: return []
+    tot = sum(nb for *_, nb in vals)
+    C = sum(s*nb for _, s, nb in vals)/tot
+    m = float(prior_weight) if prior_weight is not None else max(1000, sorted(votes)[len(votes)//2])
+    return [(r, bayesian_score(s, nb, C, m)) for r, s, nb in vals]
+
+def baseline_consensus(merged_rows: List[Dict], prior_weight: Optional[float]=None,
+                       alpha_pop_to_votes: float=0.30) -> List[Tuple[Dict, float]]:
+    recs: List[Tuple[Dict, float, float]] = []
+    w = lambda n: math.log10(1.0 + max(0.0, n))
+    for r in merged_rows:
+        s_mal = float(r["score"]) if r.get("score") not in (None, "") else None
+        try: n_mal = int(r.get("scored_by") or 0)
+        except Exception: n_mal = 0
+        s_ani = r.get("score_anilist")
+        n_ani = alpha_pop_to_votes * float(r.get("popularity_anilist") or 0)
+        parts, weights = [], []
+        if s_mal is not None and n_mal > 0: parts.append(s_mal); weights.append(w(n_mal))
+        if s_ani is not None and n_ani > 0: parts.append(float(s_ani)); weights.append(w(n_ani))
+        if parts and sum(weights) > 0:
+            s = sum(p*wt for p, wt in zip(parts, weights))/sum(weights); n = n_mal + n_ani
+            r["consensus_score"] = s; r["consensus_votes"] = int(round(n))
+            recs.append((r, s, n))
+        else:
+            if s_mal is not None: recs.append((r, s_mal, max(1.0, n_mal)))
+            elif s_ani is not None: recs.append((r, float(s_ani), max(1.0, n_ani)))
+    if not recs: return []
+    tot = sum(n for *_, n in recs)
+    C = sum(s*n for _, s, n in recs)/tot
+    ns = sorted(int(n) for *_, n in recs)
+    m = float(prior_weight) if prior_weight is not None else max(1000.0, float(ns[len(ns)//2]))
+    return [(r, bayesian_score(s, n, C, m)) for r, s, n in recs]
+
+# ---- inputs ----
+
+def make_rows(n: int, seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        score = rng.choice([None, "", rng.uniform(1, 10), round(rng.uniform(1, 10), 2)])
+        rows.append({
+            "mal_id": i,
+            # CSV caches hand back strings; MAL scores are never junk but votes can be
+            "score": str(score) if score not in (None, "") and rng.random() < 0.3 else score,
+            # vote counts straddle the 1000 floor so the median decides m in some cases
+            "scored_by": rng.choice([None, "", 0, "N/A", "12.5", rng.randint(1, 900),
+                                     rng.randint(900, 5000), str(rng.randint(1, 500000))]),
+            "score_anilist": rng.choice([None, round(rng.uniform(1, 10), 1)]),
+            "popularity_anilist": rng.choice([None, 0, 2, rng.randint(1, 200000)]),
+        })
+    return rows
+
+SIZES = [1, 2, 7, 8, 101, 200]  # odd and even counts: the prior is the *upper* median
+
+def _check(got: List[Tuple[Dict, float]], want: List[Tuple[Dict, float]]) -> None:
+    assert [r["mal_id"] for r, _ in got] == [r["mal_id"] for r, _ in want]
+    assert [s for _, s in got] == pytest.approx([s for _, s in want], rel=1e-12, abs=1e-12)
+
+@pytest.mark.parametrize("prior_weight", [None, 0, 2500])
+@pytest.mark.parametrize("n", SIZES)
+def test_bayesian_scores_match_baseline(n, prior_weight):
+    rows = make_rows(n, seed=n)
+    got = compute_bayesian_scores(rows, prior_weight)
+    _check(got, baseline_bayesian_scores(rows, prior_weight))
+    assert all(any(g is r for r in rows) for g, _ in got)  # caller's dicts, not copies
+
+@pytest.mark.parametrize("prior_weight", [None, 2500])
+@pytest.mark.parametrize("alpha", [0.30, 0.0, 1.0])
+@pytest.mark.parametrize("n", SIZES)
+def test_consensus_matches_baseline(n, alpha, prior_weight):
+    rows = make_rows(n, seed=100 + n)
+    mine, ref = copy.deepcopy(rows), copy.deepcopy(rows)
+    _check(compute_consensus_bayesian(mine, prior_weight, alpha), baseline_consensus(ref, prior_weight, alpha))
+    # both annotate the same rows in place with the fused score and vote count
+    for a, b in zip(mine, ref):
+        assert a.keys() == b.keys()
+        if "consensus_score" in b:
+            assert a["consensus_score"] == pytest.approx(b["consensus_score"], rel=1e-12)
+            assert a["consensus_votes"] == b["consensus_votes"] and type(a["consensus_votes"]) is int
+
+@pytest.mark.parametrize("votes", [[1500, 3000], [1200, 1800, 2400, 9000], [1500, 3000, 4500]])
+def test_prior_is_upper_median(votes):
+    # hand-checked: sorted(votes)[N//2], never the mean of the two middle counts
+    rows = [{"mal_id": i, "score": 5.0 + i, "scored_by": v} for i, v in enumerate(votes)]
+    m = sorted(votes)[len(votes) // 2]
+    C = sum((5.0 + i) * v for i, v in enumerate(votes)) / sum(votes)
+    want = [bayesian_score(5.0 + i, v, C, m) for i, v in enumerate(votes)]
+    assert [s for _, s in compute_bayesian_scores(rows)] == pytest.approx(want, rel=1e-12)
+    assert [s for _, s in compute_consensus_bayesian(copy.deepcopy(rows))] == pytest.approx(want, rel=1e-12)